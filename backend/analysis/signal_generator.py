@@ -155,4 +155,8 @@ class SignalGenerator:
         # Log the signals after sentiment
         logger.info(f"Signals after sentiment: {result[['symbol', 'signal', 'sentiment_score', 'confidence']].head(3)}")
         
+        # Low-cardinality labels are stored as categories
+        result['symbol'] = result['symbol'].astype('category')
+        result['signal'] = result['signal'].astype('category')
+        
         return result
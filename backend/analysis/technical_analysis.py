@@ -3,6 +3,11 @@ import numpy as np
 import talib
 from datetime import datetime
 
+# Rows of history analyze_tail keeps ahead of the rows it returns: covers the
+# longest window (SMA 200) with slack for the recursive indicators (EMA, RSI,
+# ADX, ATR) to converge
+TAIL_WARMUP_ROWS = 250
+
 class TechnicalAnalyzer:
     def __init__(self):
         pass
@@ -20,22 +25,22 @@ class TechnicalAnalyzer:
         if df.empty:
             return pd.DataFrame()
         
-        # Make a copy to avoid modifying the original
-        result = df.copy()
-        
-        # Calculate RSI
-        result['rsi_14'] = talib.RSI(result['close'], timeperiod=14)
-        
         # Calculate MACD
         macd, macd_signal, macd_hist = talib.MACD(
-            result['close'], 
+            df['close'], 
             fastperiod=12, 
             slowperiod=26, 
             signalperiod=9
         )
-        result['macd'] = macd
-        result['macd_signal'] = macd_signal
-        result['macd_hist'] = macd_hist
+        
+        # Attach the new columns alongside the input's (no defensive copy of the
+        # OHLCV data; the caller's frame is left untouched)
+        result = pd.concat([df, pd.DataFrame({
+            'rsi_14': talib.RSI(df['close'], timeperiod=14),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist
+        }, index=df.index)], axis=1, copy=False)
         
         # Replace NaN values with None for JSON compatibility
         result = result.replace({np.nan: None})
@@ -86,6 +91,47 @@ class TechnicalAnalyzer:
         
         return result
     
+    def obv(self, df):
+        """
+        Calculate On-Balance Volume over all of df
+        
+        Args:
+            df: DataFrame with OHLCV data, oldest first
+            
+        Returns:
+            numpy array with the OBV of each row
+        """
+        return np.asarray(talib.OBV(df['close'], df['volume']))
+    
+    def analyze_tail(self, df, n=10, warmup=TAIL_WARMUP_ROWS, obv=None):
+        """
+        Calculate technical indicators for only the most recent rows
+        
+        Indicators are computed over the last n + warmup rows instead of the
+        whole series, so the cost no longer grows with the length of history.
+        OBV is cumulative, so it is taken over the full history instead (a
+        single cheap pass), keeping each candle's value stable from run to run.
+        
+        Args:
+            df: DataFrame with OHLCV data, oldest first
+            n: Number of most recent rows to return
+            warmup: Rows of extra history used to warm up the indicators
+            obv: OBV over the full history for (at least) the last n rows of df,
+                for when df has already been cut down; computed from df if None
+            
+        Returns:
+            DataFrame with technical indicators for the last n rows
+        """
+        if df.empty:
+            return pd.DataFrame()
+        
+        if obv is None:
+            obv = self.obv(df)
+        
+        obv = np.asarray(obv)
+        result = self.analyze(df.tail(n + warmup)).tail(n)
+        return result.assign(obv=obv[len(obv) - len(result):])
+    
     def detect_trends(self, df):
         """
         Detect trends and generate trading signals
@@ -11,6 +11,20 @@ import numpy as np
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Batches at least this large are loaded as Parquet rather than newline-delimited JSON
+PARQUET_LOAD_MIN_ROWS = 1000
+
+# Columns (and their query parameter types) written by the virtual trading DML
+VIRTUAL_ORDER_FIELDS = [
+    ("id", "STRING"), ("timestamp", "TIMESTAMP"), ("symbol", "STRING"), ("type", "STRING"),
+    ("amount", "FLOAT64"), ("price", "FLOAT64"), ("status", "STRING"), ("cost", "FLOAT64"), ("fee", "FLOAT64")
+]
+VIRTUAL_TRADE_FIELDS = [
+    ("id", "STRING"), ("order_id", "STRING"), ("timestamp", "TIMESTAMP"), ("symbol", "STRING"), ("type", "STRING"),
+    ("amount", "FLOAT64"), ("price", "FLOAT64"), ("cost", "FLOAT64"), ("fee", "FLOAT64")
+]
+VIRTUAL_BALANCE_FIELDS = [("timestamp", "TIMESTAMP"), ("currency", "STRING"), ("amount", "FLOAT64")]
+
 # Custom JSON encoder to handle timestamps and NaN values
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -228,6 +242,10 @@ class BigQueryStorage:
         # Make a copy to avoid modifying the original
         df = df.copy()
         
+        # Write categorical columns as their plain values
+        for col in df.select_dtypes('category').columns:
+            df[col] = df[col].astype(object)
+        
         # Replace NaN values with None (which becomes NULL in BigQuery)
         for col in df.columns:
             df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
@@ -297,6 +315,41 @@ class BigQueryStorage:
             except:
                 pass
     
+    def _load_dataframe_using_parquet(self, df, table_id, schema):
+        """
+        Load a DataFrame to BigQuery as a Snappy-compressed Parquet load job
+        Avoids serializing large batches row by row; like the file load, it is
+        a batch load job rather than a streaming insert
+        """
+        try:
+            # Only send columns the table knows about, as plain (non-categorical) values
+            columns = [field.name for field in schema if field.name in df.columns]
+            df = df[columns]
+            for col in df.select_dtypes('category').columns:
+                df = df.assign(**{col: df[col].astype(object)})
+            if 'timestamp' in df.columns:
+                df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
+            
+            job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.PARQUET,
+                write_disposition="WRITE_APPEND",
+                schema=[field for field in schema if field.name in df.columns]
+            )
+            
+            job = self.client.load_table_from_dataframe(
+                df, table_id, job_config=job_config, parquet_compression='SNAPPY'
+            )
+            job.result()
+            
+            logger.info(f"Loaded {len(df)} rows to {table_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading data to {table_id}: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
     def store_market_data(self, df, timeframe):
         """
         Store market data in BigQuery
@@ -313,6 +366,19 @@ class BigQueryStorage:
         if 'timeframe' not in df.columns:
             df['timeframe'] = timeframe
         
+        self.store_market_data_batch(df)
+    
+    def store_market_data_batch(self, df):
+        """
+        Store market data for any number of symbols and timeframes in one load job
+        
+        Args:
+            df: DataFrame with market data, including a 'timeframe' column
+        """
+        if df.empty:
+            logger.warning("No market data to store")
+            return
+        
         # Prepare the table reference
         table_id = f"{self.project_id}.{self.dataset}.market_data"
         
@@ -320,8 +386,12 @@ class BigQueryStorage:
         table = self.client.get_table(table_id)
         schema = table.schema
         
-        # Load the data using a file (works around streaming insert limitation)
-        success = self._load_dataframe_using_file(df, table_id, schema)
+        # Large batches go as Parquet; small ones use a JSON file, which is
+        # cheaper to build (both work around the streaming insert limitation)
+        if len(df) >= PARQUET_LOAD_MIN_ROWS:
+            success = self._load_dataframe_using_parquet(df, table_id, schema)
+        else:
+            success = self._load_dataframe_using_file(df, table_id, schema)
         
         if success:
             logger.info(f"Stored {len(df)} market data records in BigQuery")
@@ -362,12 +432,15 @@ class BigQueryStorage:
         else:
             logger.error("Failed to store sentiment data in BigQuery")
     
-    def store_trading_signals(self, df):
+    def store_trading_signals(self, df, stamp_time=True):
         """
         Store trading signals in BigQuery
         
         Args:
             df: DataFrame with trading signals
+            stamp_time: Set every signal's timestamp to the current UTC time;
+                pass False to keep timestamps the caller stamped (e.g., when
+                signals were buffered before being stored)
         """
         if df.empty:
             logger.warning("No trading signals to store")
@@ -383,7 +456,7 @@ class BigQueryStorage:
                 df[field] = None
         
         # Make sure timestamp is current
-        if 'timestamp' in df.columns:
+        if stamp_time and 'timestamp' in df.columns:
             # Update all timestamps to current UTC time
             current_time = datetime.utcnow()
             df['timestamp'] = current_time
@@ -679,6 +752,122 @@ class BigQueryStorage:
         else:
             logger.error("Failed to store virtual balances in BigQuery")
 
+    def _field_rows(self, data, fields):
+        """
+        Pull the values of the given fields, row by row
+        
+        Args:
+            data: DataFrame, dict (one row) or list of dicts; None means no rows
+            fields: List of (column, BigQuery type) pairs
+            
+        Returns:
+            List of tuples, one per row, in field order
+        """
+        if data is None:
+            return []
+        if isinstance(data, pd.DataFrame):
+            return list(zip(*(data[column] for column, _ in fields)))
+        if isinstance(data, dict):
+            data = [data]
+        return [tuple(record[column] for column, _ in fields) for record in data]
+    
+    def _struct_array_parameter(self, name, rows, fields):
+        """
+        Build an ARRAY<STRUCT> query parameter
+        
+        Args:
+            name: Parameter name used in the query (without @)
+            rows: Row tuples from _field_rows
+            fields: List of (column, BigQuery type) pairs
+            
+        Returns:
+            bigquery.ArrayQueryParameter
+        """
+        def convert(value, field_type):
+            if field_type == "TIMESTAMP":
+                # Accepts datetimes as well as integer epoch nanoseconds
+                return pd.Timestamp(value).to_pydatetime()
+            if field_type == "FLOAT64":
+                return float(value)
+            return value
+        
+        values = [
+            bigquery.StructQueryParameter(
+                None,
+                *(bigquery.ScalarQueryParameter(column, field_type, convert(value, field_type))
+                  for (column, field_type), value in zip(fields, row))
+            )
+            for row in rows
+        ]
+        return bigquery.ArrayQueryParameter(name, "STRUCT", values)
+    
+    def _merge_virtual_balances_sql(self, parameter="balances"):
+        """MERGE statement that upserts the balances in an ARRAY<STRUCT> parameter by currency"""
+        return f"""
+        MERGE `{self.project_id}.{self.dataset}.virtual_balances` AS target
+        USING (SELECT * FROM UNNEST(@{parameter})) AS source
+        ON target.currency = source.currency
+        WHEN MATCHED THEN
+            UPDATE SET timestamp = source.timestamp, amount = source.amount
+        WHEN NOT MATCHED THEN
+            INSERT (timestamp, currency, amount) VALUES (source.timestamp, source.currency, source.amount);
+        """
+    
+    def store_virtual_batch(self, orders, trades, balances):
+        """
+        Store virtual orders and trades and upsert balances in one transaction
+        
+        Each argument may be a DataFrame, a dict (one row) or a list of dicts.
+        
+        Args:
+            orders: Virtual orders
+            trades: Virtual trades
+            balances: Balances to upsert
+            
+        Returns:
+            bool: True if the transaction committed
+        """
+        statements = []
+        parameters = []
+        
+        for table, parameter, data, fields in (
+            ("virtual_orders", "orders", orders, VIRTUAL_ORDER_FIELDS),
+            ("virtual_trades", "trades", trades, VIRTUAL_TRADE_FIELDS),
+        ):
+            rows = self._field_rows(data, fields)
+            if not rows:
+                continue
+            columns = ", ".join(column for column, _ in fields)
+            statements.append(
+                f"INSERT INTO `{self.project_id}.{self.dataset}.{table}` ({columns}) "
+                f"SELECT {columns} FROM UNNEST(@{parameter});"
+            )
+            parameters.append(self._struct_array_parameter(parameter, rows, fields))
+        
+        balance_rows = self._field_rows(balances, VIRTUAL_BALANCE_FIELDS)
+        if balance_rows:
+            statements.append(self._merge_virtual_balances_sql())
+            parameters.append(self._struct_array_parameter("balances", balance_rows, VIRTUAL_BALANCE_FIELDS))
+        
+        if not statements:
+            logger.warning("No virtual trading data to store")
+            return False
+        
+        body = "\n".join(statements)
+        query = f"""
+        BEGIN TRANSACTION;
+        {body}
+        COMMIT TRANSACTION;
+        """
+        
+        try:
+            self.client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=parameters)).result()
+            logger.info(f"Stored virtual trading batch ({len(statements)} statements) in BigQuery")
+            return True
+        except Exception as e:
+            logger.error(f"Error storing virtual trading batch: {e}")
+            return False
+
     def store_virtual_order(self, df):
         """
         Store virtual order in BigQuery
@@ -798,46 +987,48 @@ class BigQueryStorage:
             logger.error(f"Error querying virtual trades: {e}")
             return pd.DataFrame()
 
-    def clear_virtual_balances(self):
-        """Clear all virtual balances"""
-        query = f"""
-        DELETE FROM `{self.project_id}.{self.dataset}.virtual_balances`
-        WHERE 1=1
+    def _clear_tables(self, *table_names):
         """
+        Remove all rows from the given tables in a single job
         
-        try:
-            self.client.query(query)
-            logger.info("Cleared virtual balances")
-        except Exception as e:
-            logger.error(f"Error clearing virtual balances: {e}")
-
-    def clear_virtual_trading_data(self):
-        """Clear all virtual trading data"""
-        self.clear_virtual_balances()
+        TRUNCATE is a free metadata operation, but BigQuery rejects it while a
+        table has rows in the streaming buffer, so fall back to DELETE then.
         
-        # Clear orders
-        query = f"""
-        DELETE FROM `{self.project_id}.{self.dataset}.virtual_orders`
-        WHERE 1=1
+        Args:
+            table_names: Table names within the dataset
         """
+        table_ids = [f"`{self.project_id}.{self.dataset}.{name}`" for name in table_names]
         
         try:
-            self.client.query(query)
-            logger.info("Cleared virtual orders")
+            query = "\n".join(f"TRUNCATE TABLE {table_id};" for table_id in table_ids)
+            self.client.query(query).result()
+            return
         except Exception as e:
-            logger.error(f"Error clearing virtual orders: {e}")
+            logger.warning(f"TRUNCATE failed, falling back to DELETE: {e}")
         
-        # Clear trades
+        deletes = "\n".join(f"DELETE FROM {table_id} WHERE TRUE;" for table_id in table_ids)
         query = f"""
-        DELETE FROM `{self.project_id}.{self.dataset}.virtual_trades`
-        WHERE 1=1
+        BEGIN TRANSACTION;
+        {deletes}
+        COMMIT TRANSACTION;
         """
-        
+        self.client.query(query).result()
+
+    def clear_virtual_balances(self):
+        """Clear all virtual balances"""
         try:
-            self.client.query(query)
-            logger.info("Cleared virtual trades")
+            self._clear_tables("virtual_balances")
+            logger.info("Cleared virtual balances")
+        except Exception as e:
+            logger.error(f"Error clearing virtual balances: {e}")
+
+    def clear_virtual_trading_data(self):
+        """Clear all virtual trading data"""
+        try:
+            self._clear_tables("virtual_balances", "virtual_orders", "virtual_trades")
+            logger.info("Cleared virtual balances, orders and trades")
         except Exception as e:
-            logger.error(f"Error clearing virtual trades: {e}")
+            logger.error(f"Error clearing virtual trading data: {e}")
 
     def store_watchlist_item(self, user_id, symbol):
         """
@@ -1,6 +1,13 @@
 import os
+import asyncio
+import threading
+import contextvars
 import ccxt
+import ccxt.async_support as ccxta
+import numpy as np
 import pandas as pd
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
 
@@ -13,6 +20,13 @@ class MarketDataFetcher:
         self.symbols = symbols or ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT', 'ADA/USDT']
         self.exchange = self._initialize_exchange()
         
+        # Async exchange of the innermost enclosing async_exchange block, per task
+        self._aexchange = contextvars.ContextVar(f"aexchange_{id(self)}", default=None)
+        
+        # Tickers change on the order of seconds, but the UI polls them far more often
+        self._ticker_cache = TTLCache(maxsize=128, ttl=2)
+        self._ticker_cache_lock = threading.RLock()
+        
     def _initialize_exchange(self):
         """Initialize the CCXT exchange object."""
         try:
@@ -28,11 +42,53 @@ class MarketDataFetcher:
             logger.error(f"Failed to initialize exchange: {e}")
             raise
     
+    def _initialize_async_exchange(self):
+        """Initialize the asyncio CCXT exchange object."""
+        exchange_class = getattr(ccxta, self.exchange_id)
+        exchange = exchange_class({
+            'apiKey': os.getenv('EXCHANGE_API_KEY'),
+            'secret': os.getenv('EXCHANGE_SECRET_KEY'),
+            'enableRateLimit': True,
+        })
+        # Reuse markets already loaded by the sync client to skip a round-trip
+        if self.exchange.markets:
+            exchange.set_markets(self.exchange.markets, self.exchange.currencies)
+        return exchange
+    
+    @asynccontextmanager
+    async def async_exchange(self):
+        """
+        Open the asyncio exchange for the duration of the block
+        
+        ccxt binds the async client to the event loop it first runs on, so a
+        client is created per block and closed on exit. Blocks nested inside
+        another one, including in tasks it starts (e.g., with asyncio.gather),
+        share the outer client. The client is tracked in a context variable,
+        so blocks in unrelated tasks or threads each get their own.
+        """
+        exchange = self._aexchange.get()
+        if exchange is not None:
+            yield exchange
+            return
+        
+        exchange = self._initialize_async_exchange()
+        token = self._aexchange.set(exchange)
+        try:
+            yield exchange
+        finally:
+            self._aexchange.reset(token)
+            await exchange.close()
+    
     def fetch_ticker(self, symbol):
         """Fetch current ticker data for a symbol."""
+        with self._ticker_cache_lock:
+            cached = self._ticker_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
         try:
             ticker = self.exchange.fetch_ticker(symbol)
-            return {
+            ticker_data = {
                 'symbol': symbol,
                 'timestamp': datetime.fromtimestamp(ticker['timestamp'] / 1000),
                 'open': ticker['open'],
@@ -46,36 +102,90 @@ class MarketDataFetcher:
         except Exception as e:
             logger.error(f"Error fetching ticker for {symbol}: {e}")
             return None
+        
+        with self._ticker_cache_lock:
+            self._ticker_cache[symbol] = ticker_data
+        return ticker_data
     
     def fetch_all_tickers(self):
         """Fetch ticker data for all configured symbols."""
-        results = []
+        numeric_fields = ('open', 'high', 'low', 'close', 'volume', 'change', 'percentage')
+        symbols = []
+        timestamps = []
+        columns = {field: [] for field in numeric_fields}
+        
         for symbol in self.symbols:
             ticker_data = self.fetch_ticker(symbol)
             if ticker_data:
-                results.append(ticker_data)
-        return pd.DataFrame(results)
+                symbols.append(symbol)
+                timestamps.append(ticker_data['timestamp'])
+                for field in numeric_fields:
+                    value = ticker_data[field]
+                    columns[field].append(value if value is not None else np.nan)
+        
+        # Assemble typed columns directly instead of inferring dtypes from a list of dicts
+        return pd.DataFrame({
+            'symbol': symbols,
+            'timestamp': pd.to_datetime(timestamps),
+            **{field: np.asarray(values, dtype=np.float64) for field, values in columns.items()},
+        })
     
     def fetch_ohlcv(self, symbol, timeframe='1h', limit=100):
         """Fetch OHLCV (candlestick) data for a symbol."""
         try:
             ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df['symbol'] = symbol
-            return df
+            return self._ohlcv_to_dataframe(ohlcv, symbol)
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV for {symbol}: {e}")
+            return None
+    
+    async def afetch_ohlcv(self, symbol, timeframe='1h', limit=100):
+        """Fetch OHLCV data for a symbol on the asyncio exchange."""
+        try:
+            async with self.async_exchange() as exchange:
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            return self._ohlcv_to_dataframe(ohlcv, symbol)
         except Exception as e:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return None
     
+    def _ohlcv_to_dataframe(self, ohlcv, symbol):
+        """Convert raw CCXT OHLCV rows into a DataFrame."""
+        # Build float64 columns in one pass instead of letting pandas infer row by row
+        arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(arr[:, 0].astype('int64'), unit='ms'),
+            'open': arr[:, 1],
+            'high': arr[:, 2],
+            'low': arr[:, 3],
+            'close': arr[:, 4],
+            'volume': arr[:, 5],
+            'symbol': pd.Categorical([symbol] * len(arr), categories=self._symbol_categories(symbol)),
+        })
+    
+    def _symbol_categories(self, symbol):
+        """
+        Categories for the symbol column
+        
+        Sharing the configured symbol list keeps the column categorical when
+        per-symbol frames are concatenated in fetch_all_ohlcv.
+        """
+        if symbol in self.symbols:
+            return self.symbols
+        return [symbol]
+    
     def fetch_all_ohlcv(self, timeframe='1h', limit=100):
         """Fetch OHLCV data for all configured symbols."""
-        dfs = []
-        for symbol in self.symbols:
-            df = self.fetch_ohlcv(symbol, timeframe, limit)
-            if df is not None and not df.empty:
-                dfs.append(df)
+        return asyncio.run(self.afetch_all_ohlcv(timeframe, limit))
+    
+    async def afetch_all_ohlcv(self, timeframe='1h', limit=100):
+        """Fetch OHLCV data for all configured symbols concurrently."""
+        async with self.async_exchange():
+            results = await asyncio.gather(
+                *[self.afetch_ohlcv(symbol, timeframe, limit) for symbol in self.symbols]
+            )
         
+        dfs = [df for df in results if df is not None and not df.empty]
         if dfs:
             return pd.concat(dfs, ignore_index=True)
         return pd.DataFrame()
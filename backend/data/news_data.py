@@ -4,6 +4,8 @@ from datetime import datetime
 import os
 import logging
 import re
+import threading
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +14,19 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Keywords used by the simple sentiment analysis
+POSITIVE_KEYWORDS = (
+    'bullish', 'surge', 'soar', 'gain', 'rally', 'jump', 'rise', 'up', 'high', 'growth',
+    'positive', 'profit', 'success', 'win', 'good', 'strong', 'boost', 'improve', 'recover',
+    'breakthrough', 'milestone', 'partnership', 'adoption', 'launch', 'upgrade'
+)
+
+NEGATIVE_KEYWORDS = (
+    'bearish', 'crash', 'plunge', 'drop', 'fall', 'down', 'low', 'decline', 'negative',
+    'loss', 'fail', 'bad', 'weak', 'poor', 'worse', 'struggle', 'problem', 'issue',
+    'concern', 'risk', 'threat', 'hack', 'scam', 'fraud', 'ban', 'regulate', 'investigation'
+)
+
 class NewsFetcher:
     def __init__(self):
         # CryptoPanic API key - store this in your .env file
@@ -20,6 +35,22 @@ class NewsFetcher:
         
         if not self.api_key:
             logger.warning("CRYPTOPANIC_API_KEY not found in environment variables. API calls may be limited.")
+        
+        # Cache news responses for a minute to avoid repeated API round-trips
+        self._news_cache = TTLCache(maxsize=64, ttl=60)
+        self._news_cache_lock = threading.RLock()
+    
+    def _get_cached_news(self, key):
+        """Return a cached news DataFrame, or None if missing or expired"""
+        with self._news_cache_lock:
+            return self._news_cache.get(key)
+    
+    def _set_cached_news(self, key, df):
+        """Cache a news DataFrame (empty results are not cached)"""
+        if df.empty:
+            return
+        with self._news_cache_lock:
+            self._news_cache[key] = df
     
     def fetch_crypto_news(self, categories=None, items_per_category=50):
         """
@@ -66,6 +97,11 @@ class NewsFetcher:
     
     def _fetch_general_news(self, limit=50):
         """Fetch general crypto news"""
+        cache_key = (None, limit)
+        cached = self._get_cached_news(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Prepare the API endpoint
             endpoint = f"{self.base_url}/posts/"
@@ -88,7 +124,9 @@ class NewsFetcher:
                 return pd.DataFrame()
             
             # Process the news data
-            return self._process_news_data(data['results'])
+            news_df = self._process_news_data(data['results'])
+            self._set_cached_news(cache_key, news_df)
+            return news_df
             
         except Exception as e:
             logger.error(f"Error fetching general news: {e}")
@@ -96,6 +134,11 @@ class NewsFetcher:
     
     def _fetch_news_for_currency(self, currency, limit=50):
         """Fetch news for a specific currency"""
+        cache_key = (currency, limit)
+        cached = self._get_cached_news(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Prepare the API endpoint
             endpoint = f"{self.base_url}/posts/"
@@ -119,7 +162,9 @@ class NewsFetcher:
                 return pd.DataFrame()
             
             # Process the news data
-            return self._process_news_data(data['results'], related_coin=currency)
+            news_df = self._process_news_data(data['results'], related_coin=currency)
+            self._set_cached_news(cache_key, news_df)
+            return news_df
             
         except Exception as e:
             logger.error(f"Error fetching news for {currency}: {e}")
@@ -136,36 +181,30 @@ class NewsFetcher:
         Returns:
             float: Sentiment score between -1 (negative) and 1 (positive)
         """
-        if not text and not title:
+        if (not text or text.isspace()) and (not title or title.isspace()):
             return 0.0
         
-        # Combine title and text, giving more weight to the title
-        combined_text = f"{title} {title} {text}" if title else text
-        combined_text = combined_text.lower()
-        
-        # Define positive and negative keywords
-        positive_keywords = [
-            'bullish', 'surge', 'soar', 'gain', 'rally', 'jump', 'rise', 'up', 'high', 'growth',
-            'positive', 'profit', 'success', 'win', 'good', 'strong', 'boost', 'improve', 'recover',
-            'breakthrough', 'milestone', 'partnership', 'adoption', 'launch', 'upgrade'
-        ]
-        
-        negative_keywords = [
-            'bearish', 'crash', 'plunge', 'drop', 'fall', 'down', 'low', 'decline', 'negative',
-            'loss', 'fail', 'bad', 'weak', 'poor', 'worse', 'struggle', 'problem', 'issue',
-            'concern', 'risk', 'threat', 'hack', 'scam', 'fraud', 'ban', 'regulate', 'investigation'
-        ]
+        # Count keywords per field; title hits count twice to give it more weight
+        text_lower = text.lower() if text else ""
+        title_lower = title.lower() if title else ""
         
-        # Count occurrences of keywords
-        positive_count = sum(combined_text.count(word) for word in positive_keywords)
-        negative_count = sum(combined_text.count(word) for word in negative_keywords)
+        positive_count = 2 * self._count_keywords(title_lower, POSITIVE_KEYWORDS) + \
+            self._count_keywords(text_lower, POSITIVE_KEYWORDS)
+        negative_count = 2 * self._count_keywords(title_lower, NEGATIVE_KEYWORDS) + \
+            self._count_keywords(text_lower, NEGATIVE_KEYWORDS)
         
         # Calculate sentiment score
         total_count = positive_count + negative_count
         if total_count == 0:
             return 0.0  # Neutral if no keywords found
         
-        return (positive_count - negative_count) / (positive_count + negative_count)
+        return (positive_count - negative_count) / total_count
+    
+    def _count_keywords(self, text, keywords):
+        """Count occurrences of keywords in lowercase text"""
+        if not text:
+            return 0
+        return sum(text.count(word) for word in keywords)
     
     def _get_sentiment_label(self, score):
         """
@@ -264,7 +303,14 @@ class NewsFetcher:
                 continue
         
         # Create DataFrame
-        return pd.DataFrame(processed_items)
+        df = pd.DataFrame(processed_items)
+        
+        # Low-cardinality strings are stored as codes plus a shared dictionary
+        for col in ('source', 'sentiment_label', 'related_coins'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        return df
     
     def fetch_news_for_symbol(self, symbol, limit=10):
         """
@@ -1,14 +1,18 @@
 import os
+import asyncio
 import logging
 import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 # Import our modules
 from data.market_data import MarketDataFetcher
 from data.news_data import NewsFetcher
 from data.bigquery_storage import BigQueryStorage
-from analysis.technical_analysis import TechnicalAnalyzer
+from analysis.technical_analysis import TechnicalAnalyzer, TAIL_WARMUP_ROWS
 from analysis.signal_generator import SignalGenerator
 from trading.automated_trading import AutomatedTrader
 # Configure logging
@@ -21,26 +25,57 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+
+# Buffered BigQuery writes are flushed once this many rows are pending, or
+# once the oldest pending rows would otherwise wait longer than this
+WRITE_BUFFER_MAX_ROWS = 10000
+WRITE_BUFFER_MAX_SECONDS = 300
+
+# Upper bound on in-flight OHLCV requests; ccxt's rate limiter paces them further
+MAX_CONCURRENT_FETCHES = 10
+
+# Most recent rows analyzed per symbol: trend detection looks back 20 rows,
+# and the last 10 of them are stored as technical features
+ANALYZED_TAIL_ROWS = 20
+
+def _analyze_symbol(analyzer, symbol_df, obv):
+    """
+    Run technical analysis and trend detection for one symbol.
+    
+    Module-level so it can run in a worker process; the tail of the symbol's
+    frame is shipped to the worker once and both steps run there. OBV is
+    cumulative, so it comes precomputed over the symbol's full history.
+    """
+    analyzed_df = analyzer.analyze_tail(symbol_df, n=ANALYZED_TAIL_ROWS, obv=obv)
+    return analyzed_df, analyzer.detect_trends(analyzed_df)
+
 class CryptoTradingSystem:
     def __init__(self):
         # Load environment variables
         load_dotenv()
         
+        self.symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT', 'ADA/USDT']
+        self.timeframes = ['1h', '4h', '1d']
+        
         # Initialize components
-        self.market_data = MarketDataFetcher()
+        self.market_data = MarketDataFetcher(symbols=self.symbols)
         self.news_fetcher = NewsFetcher()
         self.storage = BigQueryStorage()
         self.analyzer = TechnicalAnalyzer()
         self.signal_generator = SignalGenerator()
         self.trader = AutomatedTrader(paper_trading=True)
         
-        self.symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT', 'ADA/USDT']
-        self.timeframes = ['1h', '4h', '1d']
+        # Worker processes for per-symbol technical analysis, started on first use
+        self._analysis_pool = None
+        
+        # Pending BigQuery writes, keyed by table name
+        self._write_buffer = {}
+        self._write_buffer_started = None
         
         # Recreate technical features table to ensure correct schema
         self.storage.recreate_technical_features_table()
         
-    def run(self, fetch_interval_minutes=60):
+    async def run(self, fetch_interval_minutes=60):
         """
         Run the trading system continuously.
         
@@ -49,71 +84,80 @@ class CryptoTradingSystem:
         """
         logger.info("Starting Crypto Trading System")
         
-        while True:
-            try:
-                self.process_cycle()
-                
-                # Wait for the next interval
-                logger.info(f"Waiting for {fetch_interval_minutes} minutes until next cycle")
-                time.sleep(fetch_interval_minutes * 60)
-                
-            except KeyboardInterrupt:
-                logger.info("Keyboard interrupt received, shutting down")
-                break
-                
-            except Exception as e:
-                logger.error(f"Error in main processing cycle: {e}")
-                # Wait a bit before retrying
-                time.sleep(300)
+        try:
+            while True:
+                try:
+                    await self.process_cycle()
+                    
+                    # Flush now if the buffered rows would grow too old while we sleep
+                    await self._flush_write_buffer_async(idle_seconds=fetch_interval_minutes * 60)
+                    
+                    # Wait for the next interval
+                    logger.info("Waiting for %s minutes until next cycle", fetch_interval_minutes)
+                    await asyncio.sleep(fetch_interval_minutes * 60)
+                    
+                except Exception as e:
+                    logger.error("Error in main processing cycle: %s", e)
+                    # Wait a bit before retrying
+                    await asyncio.sleep(300)
+        finally:
+            # Runs on Ctrl+C too: asyncio.run cancels this task before re-raising KeyboardInterrupt
+            self._flush_write_buffer(force=True)
+            self._shutdown_analysis_pool()
     
-    def process_cycle(self):
+    async def process_cycle(self):
         """Process a single trading cycle."""
         cycle_start = datetime.now()
-        logger.info(f"Starting processing cycle at {cycle_start}")
+        logger.info("Starting processing cycle at %s", cycle_start)
+        
+        # 1-2. Fetch market data and news concurrently
+        market_data, sentiment_df = await asyncio.gather(
+            self._fetch_all_market_data(),
+            asyncio.to_thread(self.news_fetcher.fetch_crypto_news)
+        )
         
-        # 1. Fetch market data
-        market_data = self._fetch_all_market_data()
         if market_data:
-            logger.info(f"Fetched market data for {len(market_data)} symbol-timeframe combinations")
+            logger.info("Fetched market data for %s symbol-timeframe combinations", len(market_data))
             
-            # Store market data
-            for timeframe, df in market_data.items():
-                self.storage.store_market_data(df, timeframe)
+            # Store market data for all timeframes in one batch
+            self._buffer_write('market_data', pd.concat(
+                [df.assign(timeframe=timeframe) for timeframe, df in market_data.items()],
+                ignore_index=True, copy=False, sort=False
+            ))
         else:
             logger.warning("Failed to fetch market data")
         
-        # 2. Fetch news and perform sentiment analysis
-        sentiment_df = self.news_fetcher.fetch_crypto_news()
         if not sentiment_df.empty:
-            logger.info(f"Fetched and analyzed {len(sentiment_df)} news articles")
+            logger.info("Fetched and analyzed %s news articles", len(sentiment_df))
             
             # Store sentiment data
-            self.storage.store_sentiment_data(sentiment_df)
+            self._buffer_write('sentiment_data', sentiment_df)
         else:
             logger.warning("No news articles fetched or sentiment analysis failed")
         
-        # 3. Perform technical analysis
-        technical_signals = self._perform_technical_analysis(market_data)
+        # 3. Perform technical analysis (off the event loop; the work runs in the analysis pool)
+        technical_signals = await asyncio.to_thread(self._perform_technical_analysis, market_data)
         if technical_signals is not None and not isinstance(technical_signals, pd.DataFrame):
             logger.warning("Technical analysis did not return a valid DataFrame")
         elif technical_signals is not None and not technical_signals.empty:
-            logger.info(f"Generated technical signals for {len(technical_signals)} symbols")
+            logger.info("Generated technical signals for %s symbols", len(technical_signals))
             
             # 4. Generate combined signals
             combined_signals = self.signal_generator.generate_signals(technical_signals, sentiment_df)
             if not combined_signals.empty:
-                logger.info(f"Generated {len(combined_signals)} trading signals")
+                logger.info("Generated %s trading signals", len(combined_signals))
                 
-                # Store signals
-                self.storage.store_trading_signals(combined_signals)
+                # Store signals, stamped now rather than when the buffer is flushed
+                # (which may be several cycles later)
+                self._buffer_write('trading_signals', combined_signals.assign(timestamp=datetime.utcnow()))
                 
                 # 5. Execute trades based on signals
                 transactions = self.trader.execute_signals(combined_signals)
                 if not transactions.empty:
-                    logger.info(f"Executed {len(transactions)} trades")
+                    logger.info("Executed %s trades", len(transactions))
                     
                     # Store transactions
-                    self.storage.store_transactions(transactions)
+                    self._buffer_write('transactions', transactions)
                 else:
                     logger.info("No trades were executed")
             else:
@@ -123,35 +167,129 @@ class CryptoTradingSystem:
         
         cycle_end = datetime.now()
         duration = (cycle_end - cycle_start).total_seconds()
-        logger.info(f"Processing cycle completed in {duration:.2f} seconds")
+        logger.info("Processing cycle completed in %.2f seconds", duration)
+    
+    def _buffer_write(self, table, df):
+        """
+        Queue rows for a BigQuery table until the write buffer is flushed.
+        
+        Args:
+            table: Destination table name (e.g., 'market_data')
+            df: DataFrame with the rows to write
+        """
+        if df is None or df.empty:
+            return
+        
+        if not self._write_buffer:
+            self._write_buffer_started = time.monotonic()
+        self._write_buffer.setdefault(table, []).append(df)
+    
+    def _take_write_buffer(self, force=False, idle_seconds=0):
+        """
+        Empty the write buffer if it is due for a flush.
+        
+        Args:
+            force: Take the buffer regardless of its size and age
+            idle_seconds: Time that will pass before the next chance to flush
+            
+        Returns:
+            Dict of table name -> combined DataFrame (empty if nothing is due)
+        """
+        if not self._write_buffer:
+            return {}
+        
+        pending_rows = sum(len(df) for dfs in self._write_buffer.values() for df in dfs)
+        age = time.monotonic() - self._write_buffer_started + idle_seconds
+        if not force and pending_rows < WRITE_BUFFER_MAX_ROWS and age < WRITE_BUFFER_MAX_SECONDS:
+            return {}
+        
+        buffer, self._write_buffer = self._write_buffer, {}
+        return {table: pd.concat(dfs, ignore_index=True, copy=False, sort=False) for table, dfs in buffer.items()}
+    
+    def _write_table(self, table, df):
+        """Write a combined DataFrame to its BigQuery table."""
+        try:
+            if table == 'market_data':
+                self.storage.store_market_data_batch(df)
+            elif table == 'sentiment_data':
+                self.storage.store_sentiment_data(df)
+            elif table == 'technical_features':
+                # Rows already carry their timeframe column
+                self.storage.store_technical_features(df, timeframe=None)
+            elif table == 'trading_signals':
+                # Rows were stamped when they were buffered
+                self.storage.store_trading_signals(df, stamp_time=False)
+            elif table == 'transactions':
+                self.storage.store_transactions(df)
+            else:
+                logger.error("No writer for buffered table %s", table)
+        except Exception as e:
+            logger.error("Error writing buffered %s data: %s", table, e)
+    
+    def _flush_write_buffer(self, force=False, idle_seconds=0):
+        """
+        Write buffered rows to BigQuery, one call per table.
+        
+        Args:
+            force: Flush regardless of the buffer's size and age
+            idle_seconds: Time that will pass before the next chance to flush
+        """
+        for table, df in self._take_write_buffer(force, idle_seconds).items():
+            self._write_table(table, df)
     
-    def _fetch_all_market_data(self):
+    async def _flush_write_buffer_async(self, force=False, idle_seconds=0):
+        """Like _flush_write_buffer, but writes the tables concurrently in worker threads."""
+        buffer = self._take_write_buffer(force, idle_seconds)
+        await asyncio.gather(*[
+            asyncio.to_thread(self._write_table, table, df) for table, df in buffer.items()
+        ])
+    
+    async def _fetch_all_market_data(self):
         """Fetch market data for all configured symbols and timeframes."""
-        results = {}
+        try:
+            return await self._gather_market_data()
+        except Exception as e:
+            logger.error("Error fetching market data: %s", e)
+            return {}
+    
+    async def _gather_market_data(self):
+        """Fetch every symbol/timeframe combination concurrently on one async exchange."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
         
-        for timeframe in self.timeframes:
-            try:
-                # Determine lookback period based on timeframe
-                if timeframe == '1h':
-                    lookback_days = 7
-                elif timeframe == '4h':
-                    lookback_days = 30
-                else:  # '1d'
-                    lookback_days = 200
-                
-                # Fetch data for all symbols with this timeframe
-                df = self.market_data.fetch_all_ohlcv(
+        async def fetch(symbol, timeframe):
+            async with semaphore:
+                return await self.market_data.afetch_ohlcv(
+                    symbol,
                     timeframe=timeframe,
-                    limit=lookback_days * 24  # Convert days to hours for hourly data
+                    limit=self._lookback_limit(timeframe)
                 )
-                
-                if not df.empty:
-                    results[timeframe] = df
-                    
-            except Exception as e:
-                logger.error(f"Error fetching market data for timeframe {timeframe}: {e}")
         
-        return results
+        pairs = [(timeframe, symbol) for timeframe in self.timeframes for symbol in self.symbols]
+        async with self.market_data.async_exchange():
+            frames = await asyncio.gather(*[fetch(symbol, timeframe) for timeframe, symbol in pairs])
+        
+        # Merge the per-symbol frames back into one DataFrame per timeframe
+        by_timeframe = {}
+        for (timeframe, _), df in zip(pairs, frames):
+            if df is not None and not df.empty:
+                by_timeframe.setdefault(timeframe, []).append(df)
+        
+        return {
+            timeframe: pd.concat(dfs, ignore_index=True, copy=False, sort=False)
+            for timeframe, dfs in by_timeframe.items()
+        }
+    
+    def _lookback_limit(self, timeframe):
+        """Number of candles to fetch for a timeframe."""
+        # Determine lookback period based on timeframe
+        if timeframe == '1h':
+            lookback_days = 7
+        elif timeframe == '4h':
+            lookback_days = 30
+        else:  # '1d'
+            lookback_days = 200
+        
+        return lookback_days * 24  # Convert days to hours for hourly data
     
     def _perform_technical_analysis(self, market_data):
         """Perform technical analysis on market data."""
@@ -162,48 +300,122 @@ class CryptoTradingSystem:
         timeframe = '1d' if '1d' in market_data else list(market_data.keys())[0]
         df = market_data[timeframe]
         
-        # Group by symbol and perform analysis
-        symbols = df['symbol'].unique()
-        all_signals = []
-        all_technical_features = []
+        # Split by symbol code in one pass, then analyze the symbols in parallel. Only the
+        # rows the analysis reads (the analyzed tail and its warm-up) are pickled to the
+        # pool, along with the full-history OBV of the analyzed rows
+        jobs = [
+            (
+                self.symbols[code],
+                symbol_df.tail(ANALYZED_TAIL_ROWS + TAIL_WARMUP_ROWS),
+                self.analyzer.obv(symbol_df)[-ANALYZED_TAIL_ROWS:]
+            )
+            for code, symbol_df in df.groupby(self._symbol_codes(df['symbol']), sort=False)
+            if code >= 0
+        ]
+        outcomes = self._analyze_symbols(jobs)
         
-        for symbol in symbols:
+        # One slot per symbol; pd.concat skips the slots left as None
+        all_signals = [None] * len(jobs)
+        analyzed_frames = [None] * len(jobs)
+        
+        for i, ((symbol, _, _), outcome) in enumerate(zip(jobs, outcomes)):
             try:
-                symbol_df = df[df['symbol'] == symbol].copy()
-                
-                # Perform technical analysis
-                analyzed_df = self.analyzer.analyze(symbol_df)
-                
-                # Store only the most recent technical features (to avoid storing too much data)
-                recent_features = analyzed_df.tail(10).copy()  # Store last 10 data points
-                
-                # Add to collection for batch storage
-                all_technical_features.append(recent_features)
-                
-                # Detect trends and generate signals
-                signals = self.analyzer.detect_trends(analyzed_df)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                analyzed_df, signals = outcome
+                analyzed_frames[i] = analyzed_df.tail(10)  # Store last 10 data points
                 
                 if not signals.empty:
-                    all_signals.append(signals)
+                    all_signals[i] = signals
                     
             except Exception as e:
-                logger.error(f"Error analyzing {symbol}: {e}")
+                logger.error("Error analyzing %s: %s", symbol, e)
         
         # Store all technical features in one batch
-        if all_technical_features:
+        analyzed_count = sum(analyzed_df is not None for analyzed_df in analyzed_frames)
+        if analyzed_count:
             try:
-                combined_features = pd.concat(all_technical_features, ignore_index=True)
-                self.storage.store_technical_features(combined_features, timeframe)
-                logger.info(f"Stored technical features for {len(all_technical_features)} symbols")
+                # Store only the most recent technical features (to avoid storing too much data);
+                # each frame holds a single symbol, so its tail is that symbol's last rows
+                combined_features = pd.concat(analyzed_frames, ignore_index=True, copy=False, sort=False)
+                self._buffer_write('technical_features', combined_features.assign(timeframe=timeframe))
+                logger.info("Buffered technical features for %s symbols", analyzed_count)
             except Exception as e:
-                logger.error(f"Error storing technical features: {e}")
+                logger.error("Error storing technical features: %s", e)
         
         # Combine all signals
-        if all_signals:
-            return pd.concat(all_signals, ignore_index=True)
+        if any(signals is not None for signals in all_signals):
+            return pd.concat(all_signals, ignore_index=True, copy=False, sort=False)
         else:
             return None
 
+    def _symbol_codes(self, symbols):
+        """
+        Integer code for each row of a symbol column.
+        
+        Codes index into self.symbols (-1 for symbols the system doesn't trade),
+        so grouping hashes small integers instead of strings.
+        
+        Args:
+            symbols: Series of symbol names (object or categorical)
+            
+        Returns:
+            numpy array of int8 codes
+        """
+        return pd.Categorical(symbols, categories=self.symbols).codes
+
+    def _analyze_symbols(self, jobs):
+        """
+        Run _analyze_symbol for each job, in the analysis pool.
+        
+        If the pool breaks (e.g., a worker was killed), it is dropped so the next
+        call starts a fresh one, and the jobs not finished yet run in this process.
+        
+        Args:
+            jobs: List of (symbol, symbol_df, obv) tuples
+            
+        Returns:
+            List with the (analyzed_df, signals) result, or the exception raised, per job
+        """
+        outcomes = [None] * len(jobs)
+        pending = range(len(jobs))
+        
+        try:
+            pool = self._get_analysis_pool()
+            futures = [pool.submit(_analyze_symbol, self.analyzer, symbol_df, obv) for _, symbol_df, obv in jobs]
+            for i, future in enumerate(futures):
+                try:
+                    outcomes[i] = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    outcomes[i] = e
+                pending = range(i + 1, len(jobs))
+        except BrokenProcessPool as e:
+            logger.warning("Analysis pool broke (%s); analyzing %s symbols in-process", e, len(pending))
+            self._shutdown_analysis_pool(wait=False)
+            for i in pending:
+                _, symbol_df, obv = jobs[i]
+                try:
+                    outcomes[i] = _analyze_symbol(self.analyzer, symbol_df, obv)
+                except Exception as e:
+                    outcomes[i] = e
+        
+        return outcomes
+    
+    def _shutdown_analysis_pool(self, wait=True):
+        """Stop the analysis pool's workers; the next analysis starts a new pool."""
+        if self._analysis_pool is not None:
+            pool, self._analysis_pool = self._analysis_pool, None
+            pool.shutdown(wait=wait, cancel_futures=True)
+    
+    def _get_analysis_pool(self):
+        """Start the technical analysis process pool on first use."""
+        if self._analysis_pool is None:
+            max_workers = max(1, min(len(self.symbols), os.cpu_count() or 1))
+            self._analysis_pool = ProcessPoolExecutor(max_workers=max_workers)
+        return self._analysis_pool
+
     def backtest(self, start_date, end_date):
         """
         Run a backtest of the trading strategy over a specific time period.
@@ -215,7 +427,7 @@ class CryptoTradingSystem:
         Returns:
             DataFrame with backtest results
         """
-        logger.info(f"Starting backtest from {start_date} to {end_date}")
+        logger.info("Starting backtest from %s to %s", start_date, end_date)
         
         # Fetch historical data
         historical_data = {}
@@ -232,59 +444,87 @@ class CryptoTradingSystem:
                     historical_data[timeframe] = df
                     
             except Exception as e:
-                logger.error(f"Error fetching historical data for timeframe {timeframe}: {e}")
+                logger.error("Error fetching historical data for timeframe %s: %s", timeframe, e)
         
         if not historical_data:
             logger.error("No historical data available for backtesting")
             return pd.DataFrame()
         
-        # Initialize backtest results
-        backtest_results = []
-        
         # Process data day by day
-        current_date = pd.to_datetime(start_date)
-        end = pd.to_datetime(end_date)
+        days = pd.date_range(pd.to_datetime(start_date), pd.to_datetime(end_date), freq='D')
+        
+        # Initialize backtest results, one slot per day
+        backtest_results = [None] * len(days)
         
-        while current_date <= end:
+        # Sort each timeframe once and binary-search every day's cutoff, so each
+        # day's window is a prefix slice rather than a full scan
+        day_cutoffs = {}
+        for timeframe, df in historical_data.items():
+            df = df.sort_values('timestamp', ignore_index=True)
+            historical_data[timeframe] = df
+            
+            # Rows visible on a day are those stamped at or before it
+            day_cutoffs[timeframe] = np.searchsorted(df['timestamp'].values, days.values, side='right')
+        
+        # Load sentiment for the whole backtest once; each day takes a 7-day slice
+        try:
+            sentiment_history = self.storage.get_historical_sentiment_data(
+                start_date=pd.to_datetime(start_date) - timedelta(days=7),
+                end_date=pd.to_datetime(end_date)
+            )
+        except Exception as e:
+            logger.error("Error fetching historical sentiment data: %s", e)
+            sentiment_history = pd.DataFrame()
+        
+        if sentiment_history.empty:
+            sentiment_times = np.array([], dtype='datetime64[ns]')
+        else:
+            sentiment_history = sentiment_history.sort_values('timestamp', ignore_index=True)
+            sentiment_times = sentiment_history['timestamp'].values
+        
+        for day_index, current_date in enumerate(days):
             try:
                 # Get data up to current date
                 date_data = {}
                 for timeframe, df in historical_data.items():
-                    date_data[timeframe] = df[df['timestamp'] <= current_date].copy()
+                    # A view is enough: only each symbol's analyzed tail is copied (pickled) to the worker pool
+                    date_data[timeframe] = df.iloc[:day_cutoffs[timeframe][day_index]]
                 
                 # Perform technical analysis
                 technical_signals = self._perform_technical_analysis(date_data)
                 
                 if technical_signals is not None and not technical_signals.empty:
-                    # Get historical sentiment data
-                    sentiment_df = self.storage.get_historical_sentiment_data(
-                        start_date=current_date - timedelta(days=7),
-                        end_date=current_date
-                    )
+                    # Get historical sentiment data for the past 7 days
+                    window_start = sentiment_times.searchsorted(np.datetime64(current_date - timedelta(days=7)), side='left')
+                    window_end = sentiment_times.searchsorted(np.datetime64(current_date), side='right')
+                    sentiment_df = sentiment_history.iloc[window_start:window_end]
                     
                     # Generate signals
                     signals = self.signal_generator.generate_signals(technical_signals, sentiment_df)
                     
                     if not signals.empty:
                         # Record backtest signals
-                        for _, signal in signals.iterrows():
-                            backtest_results.append({
-                                'date': current_date,
-                                'symbol': signal['symbol'],
-                                'price': signal['close'],
-                                'signal': signal['signal'],
-                                'confidence': signal.get('confidence', 0),
-                                'indicators': signal.get('indicators', '')
-                            })
+                        backtest_results[day_index] = pd.DataFrame({
+                            'date': current_date,
+                            'symbol': signals['symbol'],
+                            'price': signals['close'],
+                            'signal': signals['signal'],
+                            'confidence': signals['confidence'] if 'confidence' in signals.columns else 0,
+                            'indicators': signals['indicators'] if 'indicators' in signals.columns else ''
+                        })
             
             except Exception as e:
-                logger.error(f"Error in backtest for date {current_date}: {e}")
-            
-            # Move to next day
-            current_date += timedelta(days=1)
+                logger.error("Error in backtest for date %s: %s", current_date, e)
+        
+        self._flush_write_buffer(force=True)
+        self._shutdown_analysis_pool()
         
-        logger.info(f"Backtest completed with {len(backtest_results)} signals")
-        return pd.DataFrame(backtest_results)
+        if any(day_results is not None for day_results in backtest_results):
+            results = pd.concat(backtest_results, ignore_index=True, copy=False, sort=False)
+        else:
+            results = pd.DataFrame()
+        logger.info("Backtest completed with %s signals", len(results))
+        return results
 
     def performance_report(self):
         """Generate a performance report for the trading system."""
@@ -313,7 +553,7 @@ class CryptoTradingSystem:
             return pd.DataFrame([report])
             
         except Exception as e:
-            logger.error(f"Error generating performance report: {e}")
+            logger.error("Error generating performance report: %s", e)
             return pd.DataFrame()
 
 if __name__ == "__main__":
@@ -342,5 +582,8 @@ if __name__ == "__main__":
                 results.to_csv(f"backtest_{args.start}_to_{args.end}.csv", index=False)
     else:
         # Run the live trading system
-        system.run(fetch_interval_minutes=args.interval)
+        try:
+            asyncio.run(system.run(fetch_interval_minutes=args.interval))
+        except KeyboardInterrupt:
+            logger.info("Keyboard interrupt received, shut down")
 
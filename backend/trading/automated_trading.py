@@ -1,13 +1,216 @@
 import os
+import json
 import ccxt
+import hashlib
+import functools
+import tempfile
+import numpy as np
 import pandas as pd
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, date
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Per-user cache for exchange market metadata (precision, limits); only a
+# directory private to this user is trusted, since live orders rely on it
+MARKETS_CACHE_DIR = os.getenv('MARKETS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'crypto_bot'))
+
+def _api_key_fingerprint(api_key):
+    """Hash of the API key, so clients are cached per account without keeping the key as a cache key."""
+    return hashlib.sha256((api_key or '').encode()).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=8)
+def _load_exchange(exchange_id, api_key_fingerprint):
+    """
+    Create (once per process) the CCXT client for an exchange and account.
+    
+    Args:
+        exchange_id: The exchange to use
+        api_key_fingerprint: Fingerprint of the API key the client is built with
+        
+    Returns:
+        CCXT exchange object
+    """
+    exchange_class = getattr(ccxt, exchange_id)
+    return exchange_class({
+        'apiKey': os.getenv('EXCHANGE_API_KEY'),
+        'secret': os.getenv('EXCHANGE_SECRET_KEY'),
+        'enableRateLimit': True,
+    })
+
+def _markets_cache_dir():
+    """
+    Create the markets cache directory (mode 0700) if needed.
+    
+    Returns:
+        The directory, or None if it is not private to the current user
+    """
+    try:
+        os.makedirs(MARKETS_CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.stat(MARKETS_CACHE_DIR)
+    except OSError as e:
+        logger.warning("Markets cache unavailable at %s: %s", MARKETS_CACHE_DIR, e)
+        return None
+    
+    if hasattr(os, 'getuid') and (st.st_uid != os.getuid() or st.st_mode & 0o077):
+        logger.warning("Not using markets cache %s: it is not private to this user", MARKETS_CACHE_DIR)
+        return None
+    return MARKETS_CACHE_DIR
+
+def _load_markets_cached(exchange):
+    """
+    Load exchange markets, reusing today's on-disk copy when there is one.
+    
+    Args:
+        exchange: CCXT exchange object
+    """
+    if exchange.markets:
+        return
+    
+    cache_dir = _markets_cache_dir()
+    if cache_dir is None:
+        exchange.load_markets()
+        return
+    
+    cache_path = os.path.join(cache_dir, f"{exchange.id}_markets_{date.today().isoformat()}.json")
+    reload = False
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        exchange.set_markets(cached['markets'], cached.get('currencies'))
+        logger.info("Loaded %s markets from %s", exchange.id, cache_path)
+        return
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Corrupt or incomplete: discard it so it is rewritten below
+        logger.warning("Discarding unreadable markets cache %s: %s", cache_path, e)
+        reload = True  # Replace anything set_markets took from it
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+    
+    exchange.load_markets(reload)
+    
+    # Write to a temporary file and rename it into place, so readers never see a partial file
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{exchange.id}_markets_", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'markets': exchange.markets, 'currencies': exchange.currencies}, f, default=str)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        logger.warning("Could not write markets cache %s: %s", cache_path, e)
+
+# Simulated exchange fee for paper trades (0.1%)
+PAPER_FEE_RATE = 0.001
+
+def _fill_paper(prices, confidences, trade_amount):
+    """
+    Simulate paper fills for a batch of signals in one vectorized pass.
+    
+    Args:
+        prices: float64 array of fill prices
+        confidences: float64 array of signal confidences (0-1)
+        trade_amount: Full trade size in USD
+        
+    Returns:
+        Tuple of float64 arrays (amount, cost, fee)
+    """
+    # Adjust trade amount based on confidence
+    cost = trade_amount * confidences
+    return cost / prices, cost, cost * PAPER_FEE_RATE
+
+def _bulk_uuid4(count):
+    """
+    Generate count random (version 4) UUID strings from a single os.urandom call.
+    
+    Args:
+        count: Number of ids to generate
+        
+    Returns:
+        List of UUID strings, formatted like str(uuid.uuid4())
+    """
+    raw = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+class TradeLog:
+    """
+    Columnar (struct-of-arrays) record of executed trades.
+    
+    Numeric fields live in float64 arrays that grow geometrically, so the
+    trade history DataFrame is built from whole columns instead of one dict
+    per trade.
+    """
+    NUMERIC_FIELDS = ('price', 'amount', 'cost', 'fee')
+    OBJECT_FIELDS = ('timestamp', 'symbol', 'type', 'paper_trading', 'order_id', 'signal_id')
+    
+    def __init__(self, capacity=64):
+        self._size = 0
+        self._numeric = {field: np.empty(capacity, dtype=np.float64) for field in self.NUMERIC_FIELDS}
+        self._objects = {field: [] for field in self.OBJECT_FIELDS}
+    
+    def __len__(self):
+        return self._size
+    
+    def _reserve(self, count):
+        """Make room for count more trades, doubling capacity as needed."""
+        needed = self._size + count
+        capacity = len(self._numeric['price'])
+        if needed <= capacity:
+            return
+        
+        while capacity < needed:
+            capacity = max(1, capacity * 2)
+        
+        for field, values in self._numeric.items():
+            grown = np.empty(capacity, dtype=np.float64)
+            grown[:self._size] = values[:self._size]
+            self._numeric[field] = grown
+    
+    def append(self, trade):
+        """Record a single trade dict."""
+        self._reserve(1)
+        for field in self.NUMERIC_FIELDS:
+            value = trade.get(field)
+            self._numeric[field][self._size] = np.nan if value is None else value
+        for field in self.OBJECT_FIELDS:
+            self._objects[field].append(trade.get(field))
+        self._size += 1
+    
+    def extend(self, trades):
+        """Record every row of a transactions DataFrame."""
+        count = len(trades)
+        self._reserve(count)
+        for field in self.NUMERIC_FIELDS:
+            target = self._numeric[field][self._size:self._size + count]
+            target[:] = trades[field].to_numpy(dtype=np.float64) if field in trades.columns else np.nan
+        for field in self.OBJECT_FIELDS:
+            self._objects[field].extend(trades[field].tolist() if field in trades.columns else [None] * count)
+        self._size += count
+    
+    def to_frame(self):
+        """
+        Trade history as a DataFrame.
+        
+        The frame owns its data: changing it does not touch the log, and later
+        appends do not change it.
+        """
+        if not self._size:
+            return pd.DataFrame()
+        
+        size = self._size
+        columns = {field: self._objects[field] for field in ('timestamp', 'symbol', 'type')}
+        columns.update({field: self._numeric[field][:size].copy() for field in self.NUMERIC_FIELDS})
+        columns.update({field: self._objects[field] for field in ('paper_trading', 'order_id', 'signal_id')})
+        return pd.DataFrame(columns, copy=False)
+
 class AutomatedTrader:
     def __init__(self, exchange_id='binance', paper_trading=True):
         """
@@ -21,29 +224,24 @@ class AutomatedTrader:
         self.paper_trading = paper_trading
         self.exchange = self._initialize_exchange()
         self.trade_amount_usd = float(os.getenv('TRADE_AMOUNT_USD', 100))
-        self.trades = []
+        self.trades = TradeLog()
         
     def _initialize_exchange(self):
         """Initialize the CCXT exchange object."""
         try:
-            exchange_class = getattr(ccxt, self.exchange_id)
-            exchange = exchange_class({
-                'apiKey': os.getenv('EXCHANGE_API_KEY'),
-                'secret': os.getenv('EXCHANGE_SECRET_KEY'),
-                'enableRateLimit': True,
-            })
+            exchange = _load_exchange(self.exchange_id, _api_key_fingerprint(os.getenv('EXCHANGE_API_KEY')))
             
             if not self.paper_trading:
                 # Verify connection and authentication for real trading
-                exchange.load_markets()
+                _load_markets_cached(exchange)
                 exchange.fetch_balance()
-                logger.info(f"Successfully authenticated with {self.exchange_id}")
+                logger.info("Successfully authenticated with %s", self.exchange_id)
             else:
-                logger.info(f"Initialized paper trading mode with {self.exchange_id}")
+                logger.info("Initialized paper trading mode with %s", self.exchange_id)
                 
             return exchange
         except Exception as e:
-            logger.error(f"Failed to initialize exchange: {e}")
+            logger.error("Failed to initialize exchange: %s", e)
             raise
     
     def execute_signals(self, signals):
@@ -60,31 +258,88 @@ class AutomatedTrader:
             logger.info("No signals to execute")
             return pd.DataFrame()
         
+        signals = signals[signals['signal'].isin(['BUY', 'SELL'])]
+        if signals.empty:
+            return pd.DataFrame()
+        
+        # Paper trades are pure arithmetic, so simulate the whole batch at once
+        if self.paper_trading:
+            return self.execute_signals_bulk(signals)
+        
         transactions = []
+        signal_ids = _bulk_uuid4(len(signals))
         
-        for _, signal in signals.iterrows():
-            if signal['signal'] in ['BUY', 'SELL']:
-                try:
-                    transaction = self._execute_trade(
-                        symbol=signal['symbol'],
-                        side=signal['signal'].lower(),
-                        price=signal['close'],
-                        confidence=signal.get('confidence', 0.5)
-                    )
+        for signal_id, (_, signal) in zip(signal_ids, signals.iterrows()):
+            try:
+                transaction = self._execute_trade(
+                    symbol=signal['symbol'],
+                    side=signal['signal'].lower(),
+                    price=signal['close'],
+                    confidence=signal.get('confidence', 0.5),
+                    signal_id=signal_id
+                )
+                
+                if transaction:
+                    transactions.append(transaction)
                     
-                    if transaction:
-                        transaction['signal_id'] = str(uuid.uuid4())
-                        transactions.append(transaction)
-                        
-                except Exception as e:
-                    logger.error(f"Error executing {signal['signal']} for {signal['symbol']}: {e}")
+            except Exception as e:
+                logger.error("Error executing %s for %s: %s", signal['signal'], signal['symbol'], e)
+        
+        if not transactions:
+            return pd.DataFrame()
+        
+        transactions = pd.DataFrame(transactions)
+        transactions['symbol'] = transactions['symbol'].astype('category')
+        transactions['type'] = transactions['type'].astype('category')
+        return transactions
+    
+    def execute_signals_bulk(self, signals):
+        """
+        Simulate paper trades for a batch of BUY/SELL signals without a per-row loop.
+        
+        Fills are computed for the whole batch at once and recorded straight
+        into the columnar trade log; this is the paper trading path of
+        execute_signals and suits backtest replays.
+        
+        Args:
+            signals: DataFrame with BUY/SELL signals
+            
+        Returns:
+            DataFrame with simulated transactions
+        """
+        try:
+            price = signals['close'].to_numpy(dtype=np.float64)
+            if 'confidence' in signals.columns:
+                confidence = signals['confidence'].to_numpy(dtype=np.float64)
+            else:
+                confidence = np.full(len(signals), 0.5)
+            
+            amount, cost, fee = _fill_paper(price, confidence, self.trade_amount_usd)
+            
+            transactions = pd.DataFrame({
+                'timestamp': datetime.now(),
+                'symbol': pd.Categorical(signals['symbol']),
+                'type': pd.Categorical(signals['signal']),
+                'price': price,
+                'amount': amount,
+                'cost': cost,
+                'fee': fee,
+                'paper_trading': True,
+                'signal_id': _bulk_uuid4(len(signals)),
+            })
+        except Exception as e:
+            logger.error("Error executing paper signals: %s", e)
+            return pd.DataFrame()
         
-        return pd.DataFrame(transactions) if transactions else pd.DataFrame()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[PAPER] Executed %s trades ($%.2f)", len(transactions), transactions['cost'].sum())
+        self.trades.extend(transactions)
+        return transactions
     
-    def _execute_trade(self, symbol, side, price, confidence=0.5):
+    def _execute_trade(self, symbol, side, price, confidence=0.5, signal_id=None):
         """Execute a single trade."""
         if not os.getenv('TRADING_ENABLED', 'False').lower() in ['true', '1', 'yes'] and not self.paper_trading:
-            logger.info(f"Trading disabled. Would have executed: {side} {symbol} at {price}")
+            logger.info("Trading disabled. Would have executed: %s %s at %s", side, symbol, price)
             return None
         
         # Adjust trade amount based on confidence
@@ -95,7 +350,7 @@ class AutomatedTrader:
         
         if self.paper_trading:
             # Paper trading - simulate order
-            fee = adjusted_amount * 0.001  # Simulated 0.1% fee
+            fee = adjusted_amount * PAPER_FEE_RATE  # Simulated 0.1% fee
             
             transaction = {
                 'timestamp': datetime.now(),
@@ -105,10 +360,11 @@ class AutomatedTrader:
                 'amount': amount,
                 'cost': adjusted_amount,
                 'fee': fee,
-                'paper_trading': True
+                'paper_trading': True,
+                'signal_id': signal_id
             }
             
-            logger.info(f"[PAPER] Executed {side} {amount:.6f} {symbol} at {price} (${adjusted_amount:.2f})")
+            logger.info("[PAPER] Executed %s %.6f %s at %s ($%.2f)", side, amount, symbol, price, adjusted_amount)
             self.trades.append(transaction)
             return transaction
         else:
@@ -119,7 +375,7 @@ class AutomatedTrader:
                 else:
                     order = self.exchange.create_market_sell_order(symbol, amount)
                 
-                logger.info(f"Executed {side} {amount:.6f} {symbol} at ~{price}")
+                logger.info("Executed %s %.6f %s at ~%s", side, amount, symbol, price)
                 
                 # Extract order details
                 transaction = {
@@ -130,19 +386,20 @@ class AutomatedTrader:
                     'amount': order['amount'],
                     'cost': order['cost'],
                     'fee': order['fee']['cost'] if 'fee' in order and 'cost' in order['fee'] else None,
-                    'order_id': order['id']
+                    'order_id': order['id'],
+                    'signal_id': signal_id
                 }
                 
                 self.trades.append(transaction)
                 return transaction
                 
             except Exception as e:
-                logger.error(f"Error executing real trade: {e}")
+                logger.error("Error executing real trade: %s", e)
                 return None
     
     def get_trade_history(self):
         """Get the trading history."""
-        return pd.DataFrame(self.trades) if self.trades else pd.DataFrame()
+        return self.trades.to_frame()
 
 if __name__ == "__main__":
     # Test the automated trader with sample signals
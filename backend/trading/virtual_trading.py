@@ -1,15 +1,122 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import uuid
+from datetime import datetime, timezone
+import time
+import itertools
+import atexit
+import queue
+import threading
 import logging
 import json
+import functools
+import enum
 from typing import Dict, List, Optional, Union
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Pending storage writes (one per order) held before place_order blocks, and
+# the most the background flusher sends to storage in one transaction
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_SIZE = 500
+
+# Column types of the in-memory order and trade history. Symbols are int32
+# codes into the account's symbol table, types are Side values, and a trade
+# holds the history row of the order it filled
+ORDER_COLUMNS = {
+    "id": object, "timestamp": np.int64, "symbol": np.int32, "type": np.int8, "amount": np.float64,
+    "price": np.float64, "cost": np.float64, "fee": np.float64
+}
+TRADE_COLUMNS = {"id": object, "timestamp": np.int64, "order": np.int64}
+
+# Status of every virtual order (for simplicity, orders execute immediately); it
+# is added when orders are returned or stored rather than kept per order
+ORDER_STATUS = "EXECUTED"
+
+class Side(enum.IntEnum):
+    """Order side; stored and returned by name ("BUY"/"SELL")"""
+    BUY = 0
+    SELL = 1
+
+SIDE_NAMES = [side.name for side in Side]  # Indexed by Side value
+
+@functools.lru_cache(maxsize=1024)
+def _parse_symbol(symbol: str) -> tuple:
+    """Split a trading symbol (e.g., "BTC/USDT") into its (base, quote) currencies"""
+    return tuple(symbol.split('/'))
+
+@functools.lru_cache(maxsize=1024)
+def _usdt_symbol(currency: str) -> str:
+    """USDT trading symbol for a currency (e.g., "BTC" -> "BTC/USDT")"""
+    return f"{currency}/USDT"
+
+def _portfolio_value(amounts: np.ndarray, prices: np.ndarray, usdt: float) -> float:
+    """
+    Total portfolio value from parallel holding amount and price arrays
+    
+    Takes plain float64 arrays only, so replays that value a portfolio per bar
+    can call it directly without building the holdings summary.
+    
+    Args:
+        amounts: Holding amounts (float64)
+        prices: USDT prices of the holdings (float64)
+        usdt: USDT balance
+        
+    Returns:
+        float: Total value in USDT
+    """
+    return usdt + float(np.dot(amounts, prices))
+
+def _ns_to_datetime(ns: int) -> datetime:
+    """Convert an epoch timestamp in nanoseconds to a naive UTC datetime, like the rest of the store"""
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).replace(tzinfo=None)
+
+class _Columns:
+    """
+    Growable columnar buffer: one NumPy array per column, rows appended at the end
+    
+    Capacity doubles when full so appends stay amortized O(1); only the first
+    `count` rows are in use.
+    """
+    def __init__(self, dtypes: Dict[str, type], capacity: int = 1024):
+        self.arrays = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.count = 0
+    
+    @classmethod
+    def from_columns(cls, dtypes: Dict[str, type], columns: Dict[str, np.ndarray]) -> '_Columns':
+        """Buffer holding the given columns (all of the same length)"""
+        count = len(next(iter(columns.values())))
+        buffer = cls(dtypes, max(1024, count))
+        for name, array in buffer.arrays.items():
+            array[:count] = columns[name]
+        buffer.count = count
+        return buffer
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, *values) -> int:
+        """Append a row (values in column order) and return its row number"""
+        row = self.count
+        if row == len(self.arrays["timestamp"]):
+            self.arrays = {
+                name: np.concatenate([array, np.empty(row, dtype=array.dtype)])
+                for name, array in self.arrays.items()
+            }
+        for array, value in zip(self.arrays.values(), values):
+            array[row] = value
+        self.count = row + 1
+        return row
+    
+    def column(self, name: str) -> np.ndarray:
+        """The rows in use of a column (a view, not a copy)"""
+        return self.arrays[name][:self.count]
+    
+    def rows(self, rows: np.ndarray) -> Dict[str, list]:
+        """The given rows as a list of Python values per column"""
+        return {name: array[rows].tolist() for name, array in self.arrays.items()}
+
 class VirtualTradingAccount:
     def __init__(self, initial_balance: float = 10000.0, storage=None):
         """
@@ -21,13 +128,30 @@ class VirtualTradingAccount:
         """
         self.initial_balance = initial_balance
         self.storage = storage
-        self.balances = {"USDT": initial_balance}  # Default balance in USDT
         self.open_orders = []
-        self.order_history = []
-        self.trades = []
+        
+        # Guards balances and history against concurrent orders and readers
+        self._lock = threading.Lock()
+        
+        # Order and trade ids: a per-account boot prefix plus a sequence number
+        self._boot = f"{time.time_ns():x}"
+        self._seq = itertools.count()
+        
+        # Order and trade history as columns, oldest first
+        self._reset_history()
+        
+        # Balances as parallel columns (currency, amount) plus a currency -> row index;
+        # only the first _balance_count rows are in use
+        self._set_balances({"USDT": initial_balance})  # Default balance in USDT
         
         # Load existing data if available
         self._load_account_data()
+        
+        # Orders are written to storage by a background thread, off the order path
+        if self.storage:
+            self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+            threading.Thread(target=self._flush_writes, name="virtual-trading-writer", daemon=True).start()
+            atexit.register(self.flush)
     
     def _load_account_data(self):
         """Load account data from storage if available"""
@@ -38,24 +162,222 @@ class VirtualTradingAccount:
             # Try to load balances
             balances_df = self.storage.query_virtual_balances()
             if not balances_df.empty:
-                self.balances = {}
-                for _, row in balances_df.iterrows():
-                    self.balances[row['currency']] = row['amount']
+                # Keep the latest row per currency
+                if 'timestamp' in balances_df.columns:
+                    balances_df = balances_df.sort_values('timestamp', kind='stable')
+                balances_df = balances_df.drop_duplicates('currency', keep='last')
+                self._set_balances(dict(zip(balances_df['currency'].to_numpy(), balances_df['amount'].to_numpy())))
             
-            # Try to load order history
+            # Try to load order history and trades
             orders_df = self.storage.query_virtual_orders()
-            if not orders_df.empty:
-                self.order_history = orders_df.to_dict('records')
-                
-            # Try to load trades
             trades_df = self.storage.query_virtual_trades()
-            if not trades_df.empty:
-                self.trades = trades_df.to_dict('records')
+            if not orders_df.empty or not trades_df.empty:
+                self._load_history(orders_df, trades_df)
                 
-            logger.info(f"Loaded account data: {len(self.balances)} currencies, {len(self.order_history)} orders, {len(self.trades)} trades")
+            logger.info(f"Loaded account data: {self._balance_count} currencies, {len(self._orders)} orders, {len(self._trades)} trades")
         except Exception as e:
             logger.error(f"Error loading account data: {e}")
     
+    def _flush_writes(self):
+        """
+        Background writer: store queued orders, trades and balances in batches
+        
+        Blocks for the next write, then takes whatever else is already queued
+        (up to WRITE_BATCH_SIZE) and stores it all in one transaction.
+        """
+        while True:
+            batch = [self._write_queue.get()]
+            try:
+                while len(batch) < WRITE_BATCH_SIZE:
+                    batch.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            try:
+                # Later balances of a currency supersede earlier ones in the batch
+                balances = {}
+                for _, _, order_balances in batch:
+                    for balance in order_balances:
+                        balances[balance["currency"]] = balance
+                
+                self.storage.store_virtual_batch(
+                    [dict(order, status=ORDER_STATUS) for order, _, _ in batch],
+                    [trade for _, trade, _ in batch],
+                    list(balances.values())
+                )
+            except Exception as e:
+                logger.error(f"Error saving order data: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def flush(self):
+        """Wait until every order placed so far has been written to storage"""
+        if self.storage:
+            self._write_queue.join()
+    
+    def _next_id(self) -> str:
+        """Next order/trade id, unique for the lifetime of this account object"""
+        return f"{self._boot}-{next(self._seq):x}"
+    
+    def _reset_history(self):
+        """Empty the order and trade history"""
+        self._orders = _Columns(ORDER_COLUMNS)
+        self._trades = _Columns(TRADE_COLUMNS)
+        self._symbols = []
+        self._symbol_codes = {}
+        
+        # Leading order rows that are stand-ins for trades' missing orders:
+        # referenced by their trades, but not part of the order history
+        self._stand_in_orders = 0
+    
+    def _symbol_code(self, symbol: str) -> int:
+        """Code of a symbol in the symbol table, adding it if new"""
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._symbol_codes[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return code
+    
+    @staticmethod
+    def _history_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Stored orders or trades oldest first, with epoch-nanosecond timestamps"""
+        df = df.sort_values('timestamp', kind='stable')
+        return df.assign(timestamp=pd.to_datetime(df['timestamp'], utc=True).astype('int64'))
+    
+    def _load_history(self, orders_df: pd.DataFrame, trades_df: pd.DataFrame):
+        """
+        Replace the order and trade history with stored orders and trades
+        
+        A trade whose order is not stored gets a stand-in order built from the
+        trade's own columns, so its details are not lost. Stand-ins go ahead of
+        the stored orders and are left out of get_order_history, which lists
+        only orders that were stored.
+        
+        Args:
+            orders_df: DataFrame with stored orders
+            trades_df: DataFrame with stored trades
+        """
+        frames = []
+        if not trades_df.empty:
+            stored_ids = orders_df['id'] if 'id' in orders_df.columns else []
+            orphans = trades_df[~trades_df['order_id'].isin(stored_ids)]
+            if not orphans.empty:
+                orphans = orphans.assign(id=orphans['order_id'])[list(ORDER_COLUMNS)]
+                frames.append(self._history_frame(orphans.drop_duplicates('id', keep='last')))
+        stand_ins = len(frames[0]) if frames else 0
+        if not orders_df.empty:
+            frames.append(self._history_frame(orders_df))
+        
+        orders_df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        codes, symbols = pd.factorize(orders_df['symbol'])
+        self._symbols = symbols.tolist()
+        self._symbol_codes = {symbol: code for code, symbol in enumerate(self._symbols)}
+        
+        columns = {name: orders_df[name].to_numpy() for name in ORDER_COLUMNS}
+        columns["symbol"] = codes
+        columns["type"] = orders_df['type'].map(Side.__members__).astype(np.int8).to_numpy()
+        self._orders = _Columns.from_columns(ORDER_COLUMNS, columns)
+        self._stand_in_orders = stand_ins
+        
+        if trades_df.empty:
+            self._trades = _Columns(TRADE_COLUMNS)
+            return
+        
+        # Link each trade to its order's history row (the last one, should an id repeat)
+        trades_df = self._history_frame(trades_df)
+        order_rows = pd.Series(np.arange(len(orders_df)), index=orders_df['id'].to_numpy())
+        order_rows = order_rows[~order_rows.index.duplicated(keep='last')]
+        self._trades = _Columns.from_columns(TRADE_COLUMNS, {
+            "id": trades_df['id'].to_numpy(),
+            "timestamp": trades_df['timestamp'].to_numpy(),
+            "order": trades_df['order_id'].map(order_rows).to_numpy()
+        })
+    
+    def _order_records(self, rows: np.ndarray) -> List[Dict]:
+        """
+        Orders at the given history rows as dicts, for callers
+        
+        Args:
+            rows: History row numbers
+            
+        Returns:
+            List[Dict]: Orders with symbol names and datetime timestamps
+        """
+        columns = self._orders.rows(rows)
+        symbols = self._symbols
+        columns["symbol"] = [symbols[code] for code in columns["symbol"]]
+        columns["type"] = [SIDE_NAMES[code] for code in columns["type"]]
+        columns["timestamp"] = [_ns_to_datetime(ns) for ns in columns["timestamp"]]
+        
+        names = list(columns)
+        return [dict(zip(names, values), status=ORDER_STATUS) for values in zip(*columns.values())]
+    
+    def _trade_records(self, rows: np.ndarray) -> List[Dict]:
+        """
+        Trades at the given history rows as dicts (joined with their orders), for callers
+        
+        Args:
+            rows: History row numbers
+            
+        Returns:
+            List[Dict]: Trades with symbol names and datetime timestamps
+        """
+        trades = self._trades.rows(rows)
+        orders = self._order_records(self._trades.arrays["order"][rows])
+        return [
+            {
+                "id": trade_id,
+                "order_id": order["id"],
+                "timestamp": _ns_to_datetime(timestamp),
+                "symbol": order["symbol"],
+                "type": order["type"],
+                "amount": order["amount"],
+                "price": order["price"],
+                "cost": order["cost"],
+                "fee": order["fee"]
+            }
+            for trade_id, timestamp, order in zip(trades["id"], trades["timestamp"], orders)
+        ]
+    
+    def _set_balances(self, balances: Dict[str, float]):
+        """
+        Replace all balances
+        
+        Args:
+            balances: Dictionary of currency balances
+        """
+        count = len(balances)
+        capacity = max(8, count)
+        
+        self._currencies = np.empty(capacity, dtype=object)
+        self._amounts = np.zeros(capacity, dtype=np.float64)
+        self._currencies[:count] = list(balances.keys())
+        self._amounts[:count] = list(balances.values())
+        self._currency_index = {currency: i for i, currency in enumerate(balances)}
+        self._balance_count = count
+    
+    def _set_balance(self, currency: str, amount: float):
+        """
+        Set the balance of a currency, adding a row for a new currency
+        
+        Args:
+            currency: Currency code
+            amount: New balance amount
+        """
+        index = self._currency_index.get(currency)
+        if index is None:
+            index = self._balance_count
+            if index == len(self._amounts):
+                # Grow geometrically so adding currencies stays amortized O(1)
+                self._currencies = np.concatenate([self._currencies, np.empty(index, dtype=object)])
+                self._amounts = np.concatenate([self._amounts, np.zeros(index, dtype=np.float64)])
+            self._currencies[index] = currency
+            self._currency_index[currency] = index
+            self._balance_count += 1
+        
+        self._amounts[index] = amount
+    
     def get_balance(self, currency: str = "USDT") -> float:
         """
         Get balance for a specific currency
@@ -66,7 +388,13 @@ class VirtualTradingAccount:
         Returns:
             float: Balance amount
         """
-        return self.balances.get(currency, 0.0)
+        with self._lock:
+            return self._balance(currency)
+    
+    def _balance(self, currency: str) -> float:
+        """Balance of a currency (0.0 if none); the caller holds self._lock"""
+        index = self._currency_index.get(currency)
+        return float(self._amounts[index]) if index is not None else 0.0
     
     def get_all_balances(self) -> Dict[str, float]:
         """
@@ -75,7 +403,9 @@ class VirtualTradingAccount:
         Returns:
             Dict[str, float]: Dictionary of currency balances
         """
-        return self.balances
+        with self._lock:
+            count = self._balance_count
+            return dict(zip(self._currencies[:count].tolist(), self._amounts[:count].tolist()))
     
     def get_portfolio_value(self, current_prices: Dict[str, float]) -> Dict:
         """
@@ -87,24 +417,40 @@ class VirtualTradingAccount:
         Returns:
             Dict: Portfolio summary
         """
-        total_value = self.balances.get("USDT", 0.0)
-        holdings = []
+        # Take a consistent snapshot of the balances: the USDT balance and the
+        # non-USDT currencies with a balance (flattened positions stay at zero)
+        with self._lock:
+            usdt_balance = self._balance("USDT")
+            count = self._balance_count
+            held = (self._amounts[:count] != 0.0) & (self._currencies[:count] != "USDT")
+            currencies = self._currencies[:count][held]
+            amounts = self._amounts[:count][held]
         
-        for currency, amount in self.balances.items():
-            if currency == "USDT":
-                continue
-                
-            symbol = f"{currency}/USDT"
-            price = current_prices.get(symbol, 0.0)
-            value = amount * price
-            total_value += value
+        if len(amounts):
+            prices = np.fromiter(
+                (current_prices.get(_usdt_symbol(currency), 0.0) for currency in currencies),
+                dtype=np.float64,
+                count=len(currencies)
+            )
+            
+            # One dot product values every non-USDT holding
+            total_value = _portfolio_value(amounts, prices, usdt_balance)
             
-            holdings.append({
-                "currency": currency,
-                "amount": amount,
-                "price": price,
-                "value": value
-            })
+            holdings = [
+                {
+                    "currency": currency,
+                    "amount": amount,
+                    "price": price,
+                    "value": value
+                }
+                for currency, amount, price, value in zip(
+                    currencies.tolist(), amounts.tolist(), prices.tolist(), (amounts * prices).tolist()
+                )
+            ]
+        else:
+            # Nothing but USDT: skip the price lookups entirely
+            total_value = usdt_balance
+            holdings = []
         
         # Calculate performance metrics
         initial_value = self.initial_balance
@@ -114,19 +460,19 @@ class VirtualTradingAccount:
         return {
             "total_value": total_value,
             "holdings": holdings,
-            "usdt_balance": self.balances.get("USDT", 0.0),
+            "usdt_balance": usdt_balance,
             "profit_loss": profit_loss,
             "profit_loss_pct": profit_loss_pct,
             "initial_value": initial_value
         }
     
-    def place_order(self, symbol: str, order_type: str, amount: float, price: float = None) -> Dict:
+    def place_order(self, symbol: str, order_type: Union[str, Side], amount: float, price: float = None) -> Dict:
         """
         Place a virtual order
         
         Args:
             symbol: Trading symbol (e.g., "BTC/USDT")
-            order_type: Order type ("BUY" or "SELL")
+            order_type: Order type ("BUY" or "SELL", or a Side)
             amount: Amount to buy/sell
             price: Price to buy/sell at (None for market orders)
             
@@ -135,10 +481,11 @@ class VirtualTradingAccount:
         """
         try:
             # Parse the symbol
-            base_currency, quote_currency = symbol.split('/')
+            base_currency, quote_currency = _parse_symbol(symbol)
             
             # Validate order
-            if order_type not in ["BUY", "SELL"]:
+            side = order_type if isinstance(order_type, Side) else Side.__members__.get(order_type)
+            if side is None:
                 return {"success": False, "message": "Invalid order type. Use 'BUY' or 'SELL'."}
             
             if amount <= 0:
@@ -148,93 +495,111 @@ class VirtualTradingAccount:
             if price is None:
                 return {"success": False, "message": "Price is required for virtual trading."}
             
-            # Check if we have enough balance
-            if order_type == "BUY":
-                required_balance = amount * price
-                if self.balances.get(quote_currency, 0) < required_balance:
-                    return {"success": False, "message": f"Insufficient {quote_currency} balance."}
-            else:  # SELL
-                if self.balances.get(base_currency, 0) < amount:
-                    return {"success": False, "message": f"Insufficient {base_currency} balance."}
-            
-            # Create order
-            order_id = str(uuid.uuid4())
-            timestamp = datetime.now()
-            order = {
-                "id": order_id,
-                "timestamp": timestamp,
-                "symbol": symbol,
-                "type": order_type,
-                "amount": amount,
-                "price": price,
-                "status": "EXECUTED",  # For simplicity, we execute immediately
-                "cost": amount * price,
-                "fee": amount * price * 0.001  # 0.1% fee
-            }
-            
-            # Execute order (update balances)
-            if order_type == "BUY":
-                # Deduct quote currency (e.g., USDT)
-                self.balances[quote_currency] = self.balances.get(quote_currency, 0) - order["cost"] - order["fee"]
-                # Add base currency (e.g., BTC)
-                self.balances[base_currency] = self.balances.get(base_currency, 0) + amount
-            else:  # SELL
-                # Deduct base currency
-                self.balances[base_currency] = self.balances.get(base_currency, 0) - amount
-                # Add quote currency
-                self.balances[quote_currency] = self.balances.get(quote_currency, 0) + order["cost"] - order["fee"]
-            
-            # Add to order history
-            self.order_history.append(order)
-            
-            # Add to trades
-            trade = {
-                "id": str(uuid.uuid4()),
-                "order_id": order_id,
-                "timestamp": timestamp,
-                "symbol": symbol,
-                "type": order_type,
-                "amount": amount,
-                "price": price,
-                "cost": order["cost"],
-                "fee": order["fee"]
-            }
-            self.trades.append(trade)
-            
-            # Save to storage if available
-            if self.storage:
-                try:
-                    # Save order
-                    order_df = pd.DataFrame([order])
-                    self.storage.store_virtual_order(order_df)
-                    
-                    # Save trade
-                    trade_df = pd.DataFrame([trade])
-                    self.storage.store_virtual_trade(trade_df)
-                    
-                    # Save updated balances
-                    balance_records = []
-                    for currency, amount in self.balances.items():
-                        balance_records.append({
-                            "timestamp": timestamp,
-                            "currency": currency,
-                            "amount": amount
-                        })
-                    balance_df = pd.DataFrame(balance_records)
-                    self.storage.store_virtual_balances(balance_df)
-                except Exception as e:
-                    logger.error(f"Error saving order data: {e}")
+            cost = amount * price
+            fee = cost * 0.001  # 0.1% fee
             
+            # Orders can be placed from several threads (the Flask app is threaded):
+            # the balance read-modify-write, the history appends and the queueing
+            # (whose order decides which balance storage keeps) happen as one step
+            with self._lock:
+                # Read both balances once; the order works on these locals from here on
+                quote_balance = self._balance(quote_currency)
+                base_balance = self._balance(base_currency)
+                
+                # Check if we have enough balance
+                if side is Side.BUY:
+                    if quote_balance < cost:
+                        return {"success": False, "message": f"Insufficient {quote_currency} balance."}
+                else:  # SELL
+                    if base_balance < amount:
+                        return {"success": False, "message": f"Insufficient {base_currency} balance."}
+                
+                # Create order
+                order_id = self._next_id()
+                timestamp = time.time_ns()  # Converted to datetime when exported or stored
+                order = {
+                    "id": order_id,
+                    "timestamp": timestamp,
+                    "symbol": symbol,
+                    "type": side.name,
+                    "amount": amount,
+                    "price": price,
+                    "cost": cost,
+                    "fee": fee
+                }
+                
+                # Execute order (update balances)
+                if side is Side.BUY:
+                    # Deduct quote currency (e.g., USDT), add base currency (e.g., BTC)
+                    quote_balance -= cost + fee
+                    base_balance += amount
+                else:  # SELL
+                    # Deduct base currency, add quote currency
+                    base_balance -= amount
+                    quote_balance += cost - fee
+                self._set_balance(quote_currency, quote_balance)
+                self._set_balance(base_currency, base_balance)
+                
+                # Add to order history, and to trades (the trade shares the order's details)
+                trade_id = self._next_id()
+                row = self._orders.append(order_id, timestamp, self._symbol_code(symbol), side, amount, price, cost, fee)
+                self._trades.append(trade_id, timestamp, row)
+                
+                # Queue the order, its trade and the two balances it changed for the background writer
+                if self.storage:
+                    trade = {
+                        "id": trade_id,
+                        "order_id": order_id,
+                        "timestamp": timestamp,
+                        "symbol": symbol,
+                        "type": side.name,
+                        "amount": amount,
+                        "price": price,
+                        "cost": cost,
+                        "fee": fee
+                    }
+                    self._write_queue.put((order, trade, [
+                        {"timestamp": timestamp, "currency": quote_currency, "amount": quote_balance},
+                        {"timestamp": timestamp, "currency": base_currency, "amount": base_balance}
+                    ]))
+                
             return {
                 "success": True,
-                "message": f"{order_type} order executed successfully.",
-                "order": order
+                "message": f"{side.name} order executed successfully.",
+                "order": {**order, "timestamp": _ns_to_datetime(timestamp), "status": ORDER_STATUS}
             }
             
         except Exception as e:
             logger.error(f"Error placing order: {e}")
             return {"success": False, "message": f"Error placing order: {str(e)}"}
     
+    def _newest_rows(self, count: int, symbols: Optional[np.ndarray], symbol: str, limit: int,
+                     start: int = 0) -> np.ndarray:
+        """
+        History rows to return, newest first, optionally for one symbol
+        
+        Args:
+            count: Number of history rows
+            symbols: Symbol code of each history row (needed only with a symbol)
+            symbol: Filter by symbol (optional)
+            limit: Maximum number of rows to return
+            start: First row that can be returned
+            
+        Returns:
+            np.ndarray: Row numbers
+        """
+        limit = max(limit, 0)
+        
+        # History is kept in timestamp order, so take the newest from the end
+        if symbol:
+            code = self._symbol_codes.get(symbol)
+            if code is None or not limit:
+                return np.empty(0, dtype=np.intp)
+            rows = np.flatnonzero(symbols[start:] == code)[-limit:] + start
+        else:
+            rows = np.arange(max(count - limit, start), count)
+        return rows[::-1]
+    
     def get_order_history(self, symbol: str = None, limit: int = 50) -> List[Dict]:
         """
         Get order history
@@ -246,16 +611,11 @@ class VirtualTradingAccount:
         Returns:
             List[Dict]: List of orders
         """
-        if symbol:
-            filtered_orders = [order for order in self.order_history if order["symbol"] == symbol]
-        else:
-            filtered_orders = self.order_history
-        
-        # Sort by timestamp (newest first)
-        sorted_orders = sorted(filtered_orders, key=lambda x: x["timestamp"], reverse=True)
-        
-        # Limit the number of orders
-        return sorted_orders[:limit]
+        with self._lock:
+            rows = self._newest_rows(
+                len(self._orders), self._orders.column("symbol"), symbol, limit, start=self._stand_in_orders
+            )
+            return self._order_records(rows)
     
     def get_trades(self, symbol: str = None, limit: int = 50) -> List[Dict]:
         """
@@ -268,16 +628,11 @@ class VirtualTradingAccount:
         Returns:
             List[Dict]: List of trades
         """
-        if symbol:
-            filtered_trades = [trade for trade in self.trades if trade["symbol"] == symbol]
-        else:
-            filtered_trades = self.trades
-        
-        # Sort by timestamp (newest first)
-        sorted_trades = sorted(filtered_trades, key=lambda x: x["timestamp"], reverse=True)
-        
-        # Limit the number of trades
-        return sorted_trades[:limit]
+        with self._lock:
+            # A trade's symbol is its order's
+            symbols = self._orders.column("symbol")[self._trades.column("order")] if symbol else None
+            rows = self._newest_rows(len(self._trades), symbols, symbol, limit)
+            return self._trade_records(rows)
     
     def reset_account(self) -> Dict:
         """
@@ -286,25 +641,29 @@ class VirtualTradingAccount:
         Returns:
             Dict: Status message
         """
-        self.balances = {"USDT": self.initial_balance}
-        self.open_orders = []
-        self.order_history = []
-        self.trades = []
-        
-        # Clear data in storage if available
-        if self.storage:
-            try:
-                self.storage.clear_virtual_trading_data()
-                
-                # Save initial balance
-                balance_records = [{
-                    "timestamp": datetime.now(),
-                    "currency": "USDT",
-                    "amount": self.initial_balance
-                }]
-                balance_df = pd.DataFrame(balance_records)
-                self.storage.store_virtual_balances(balance_df)
-            except Exception as e:
-                logger.error(f"Error clearing account data: {e}")
+        # Hold off new orders until storage and memory are both back to the initial state
+        with self._lock:
+            # Let queued writes land first, so they are cleared along with the rest
+            self.flush()
+            
+            self._set_balances({"USDT": self.initial_balance})
+            self.open_orders = []
+            self._reset_history()
+            
+            # Clear data in storage if available
+            if self.storage:
+                try:
+                    self.storage.clear_virtual_trading_data()
+                    
+                    # Save initial balance
+                    balance_records = [{
+                        "timestamp": datetime.utcnow(),
+                        "currency": "USDT",
+                        "amount": self.initial_balance
+                    }]
+                    balance_df = pd.DataFrame(balance_records)
+                    self.storage.store_virtual_balances(balance_df)
+                except Exception as e:
+                    logger.error(f"Error clearing account data: {e}")
         
         return {"success": True, "message": "Account reset successfully."}